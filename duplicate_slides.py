@@ -1,13 +1,134 @@
 from copy import deepcopy
 from pathlib import Path
 from io import BytesIO
+import functools
+import mmap
+import os
 import random
-
+import re
+import struct
+import zipfile
+
+from docx import Document
+from docx.oxml.ns import qn as wqn
+from lxml import etree
+from PIL import Image as _PILImage
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.opc.serialized import _ZipPkgWriter
 from pptx.oxml.ns import qn
-from pptx.util import Inches
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.util import Inches, Pt
 from pptx.oxml.xmlchemy import OxmlElement
+from pptx.text.text import _Paragraph
+
+# Qualified (Clark-notation) names resolved once at import instead of per call
+_Q_CSLD = qn("p:cSld")
+_Q_BG = qn("p:bg")
+_Q_EMBED = qn("r:embed")
+_Q_RID = qn("r:id")
+_Q_SPPR = qn("p:spPr")
+_Q_XFRM = qn("a:xfrm")
+_Q_OFF = qn("a:off")
+_Q_EXT = qn("a:ext")
+_Q_IND = qn("a:ind")
+_Q_BUNONE = qn("a:buNone")
+# insert_element_before() takes prefixed tag names, not Clark notation
+_Q_EXTLST = "p:extLst"
+
+_NSMAP = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+}
+# Compiled once so per-shape lookups run in lxml's C XPath engine
+_BLIP_EMBED_XPATH = etree.XPath("./descendant::a:blip[@r:embed][1]", namespaces=_NSMAP)
+# Every element carrying a relationship reference, collected in one tree walk
+_REL_ATTR_XPATH = etree.XPath(".//*[@r:embed or @r:id]", namespaces=_NSMAP)
+# Any relationship-namespace attribute in a subtree, including on its root
+_ANY_REL_ATTR_XPATH = etree.XPath("descendant-or-self::*/@r:*", namespaces=_NSMAP)
+
+# Media members that are already compressed and gain nothing from deflate
+_STORED_MEDIA_RE = re.compile(r"^ppt/media/.*\.(png|jpe?g|gif)$", re.IGNORECASE)
+
+# WordprocessingML lookups used when reading the source outline
+_W_P = wqn("w:p")
+_W_PPR = wqn("w:pPr")
+_W_IND = wqn("w:ind")
+_W_VAL = wqn("w:val")
+_W_LEFT = wqn("w:left")
+_W_ILVL_PATH = wqn("w:numPr") + "/" + wqn("w:ilvl")
+
+
+def _cache_partname_counters(package):
+    """Make partname allocation on `package` O(1) by caching the next free index per prefix.
+
+    python-pptx rescans every part in the package for each new notes slide or image part,
+    which turns repeated additions quadratic. The counters are seeded from the parts present
+    on first use and simply incremented afterwards.
+    """
+    next_idx = {}
+
+    def next_partname(tmpl):
+        prefix = tmpl[: (tmpl % 42).find("42")]
+        if prefix not in next_idx:
+            idxs = [
+                p.partname.idx
+                for p in package.iter_parts()
+                if p.partname.startswith(prefix) and p.partname.idx is not None
+            ]
+            next_idx[prefix] = max(idxs, default=0) + 1
+        n = next_idx[prefix]
+        next_idx[prefix] = n + 1
+        return PackURI(tmpl % n)
+
+    def next_image_partname(ext):
+        return next_partname("/ppt/media/image%d." + ext)
+
+    package.next_partname = next_partname
+    package.next_image_partname = next_image_partname
+
+
+def _layout_bg_bytes(layout):
+    """Return the serialized `<p:bg>` of `layout` (or None), cached on the layout object."""
+    try:
+        return layout._bg_bytes_cache
+    except AttributeError:
+        layout_bg = layout.element.find(_Q_CSLD + "/" + _Q_BG)
+        bg_bytes = etree.tostring(layout_bg) if layout_bg is not None else None
+        layout._bg_bytes_cache = bg_bytes
+        return bg_bytes
+
+
+def _copy_bg(source_csld, new_csld, inherited_bg=None):
+    """Copy the `<p:bg>` of `source_csld` into `new_csld`, replacing any existing background.
+
+    Nothing is copied when the source has no background, or when its serialization equals
+    `inherited_bg` (the background the new slide already gets from its layout) and it holds
+    no relationship references. rIds are scoped to each part's own rels, so equal bytes with
+    an `r:embed` can still point at different images on the slide and on the layout.
+    """
+    source_bg = None
+    for child in source_csld:
+        if child.tag == _Q_BG:
+            source_bg = child
+            break
+    if source_bg is None:
+        return
+    if (
+        inherited_bg is not None
+        and etree.tostring(source_bg) == inherited_bg
+        and not _ANY_REL_ATTR_XPATH(source_bg)
+    ):
+        return
+    for child in new_csld:
+        if child.tag == _Q_BG:
+            new_csld.remove(child)
+            break
+    # Background goes first in cSld (before spTree)
+    new_csld.insert(0, deepcopy(source_bg))
 
 
 def duplicate_slide(prs: Presentation, source_slide):
@@ -18,47 +139,45 @@ def duplicate_slide(prs: Presentation, source_slide):
     # Create new slide using layout
     new_slide = prs.slides.add_slide(layout)
 
-    # Map old rel IDs to new ones so embedded images/hyperlinks work.
+    # Map old rel IDs to new ones so embedded images/hyperlinks work. Relationships are
+    # written straight into the new part's rels; relate_to() would rescan the whole
+    # collection for a match and a free rId on every call.
+    new_rels = new_slide.part.rels
+    existing = {(rel.reltype, rel._target): rId for rId, rel in new_rels._rels.items()}
+    next_rid = max((int(k[3:]) for k in new_rels._rels if k[3:].isdigit()), default=0) + 1
     rel_id_map = {}
     for rel_obj in list(source.part.rels._rels.values()):
         if "notesSlide" in rel_obj.reltype:
             continue
-        new_rid = new_slide.part.relate_to(rel_obj._target, rel_obj.reltype)
+        key = (rel_obj.reltype, rel_obj._target)
+        new_rid = existing.get(key)
+        if new_rid is None:
+            new_rid = "rId%d" % next_rid
+            next_rid += 1
+            new_rels._rels[new_rid] = _Relationship(
+                new_rels._base_uri, new_rid, rel_obj.reltype, rel_obj._target_mode, rel_obj._target
+            )
+            existing[key] = new_rid
         rel_id_map[rel_obj.rId] = new_rid
 
-    # Copy background from source slide
-    source_csld = source.element.find(qn("p:cSld"))
-    new_csld = new_slide.element.find(qn("p:cSld"))
-    
+    # Copy background from source slide; the new slide inherits its layout's background,
+    # so copying a <p:bg> identical to the layout's is wasted work
+    source_csld = source.element.find(_Q_CSLD)
+    new_csld = new_slide.element.find(_Q_CSLD)
     if source_csld is not None and new_csld is not None:
-        source_bg = source_csld.find(qn("p:bg"))
-        if source_bg is not None:
-            # Remove any existing background in new slide
-            existing_bg = new_csld.find(qn("p:bg"))
-            if existing_bg is not None:
-                new_csld.remove(existing_bg)
-            
-            # Deep copy the background element
-            new_bg = deepcopy(source_bg)
-            
-            # Insert background as first element in cSld (before spTree)
-            # Get all children to find insertion point
-            children = list(new_csld)
-            if children:
-                # Insert before first child
-                new_csld.insert(0, new_bg)
-            else:
-                new_csld.append(new_bg)
+        _copy_bg(source_csld, new_csld, inherited_bg=_layout_bg_bytes(layout))
 
     # Copy shapes from source
     for shape in source.shapes:
         new_el = deepcopy(shape.element)
-        new_slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
+        new_slide.shapes._spTree.insert_element_before(new_el, _Q_EXTLST)
 
     # Normalize logo position: move logo to top-right corner
     logo_top = Inches(0)
     slide_w = prs.slide_width
     margin_right = Inches(0.3)  # Small margin from right edge
+    right_edge = slide_w - margin_right
+    threshold_x = slide_w * 0.7
 
     for shp in new_slide.shapes:
         try:
@@ -66,33 +185,26 @@ def duplicate_slide(prs: Presentation, source_slide):
             if shp.shape_type == 13 and shp.width <= Inches(3) and shp.height <= Inches(3):
                 # Position logo at top-right
                 shp.top = logo_top
-                shp.left = slide_w - shp.width - margin_right
+                shp.left = right_edge - shp.width
             # Check for FREEFORM shapes with embedded images in top-right area (logos)
             elif shp.shape_type == 5:  # FREEFORM
                 # Check if it has an embedded image and is positioned near top-right
-                has_image = False
-                for blip in shp.element.iter(qn("a:blip")):
-                    if blip.get(qn("r:embed")):
-                        has_image = True
-                        break
-                if has_image and shp.top < Inches(2) and shp.left > slide_w * 0.7:
+                has_image = bool(_BLIP_EMBED_XPATH(shp.element))
+                if has_image and shp.top < Inches(2) and shp.left > threshold_x:
                     # This is likely the logo - position at top-right
                     shp.top = logo_top
-                    shp.left = slide_w - shp.width - margin_right
+                    shp.left = right_edge - shp.width
         except Exception:
             continue
 
     # Update relationship references inside the new slide XML
-    rel_key = qn("r:embed")
-    hyperlink_key = qn("r:id")
-    for blip in new_slide.element.iter(qn("a:blip")):
-        rid = blip.get(rel_key)
-        if rid and rid in rel_id_map:
-            blip.set(rel_key, rel_id_map[rid])
-    for elm in new_slide.element.iter():
-        rid = elm.get(hyperlink_key)
-        if rid and rid in rel_id_map:
-            elm.set(hyperlink_key, rel_id_map[rid])
+    if rel_id_map:
+        get = rel_id_map.get
+        for elm in _REL_ATTR_XPATH(new_slide.element):
+            for key in (_Q_EMBED, _Q_RID):
+                new_rid = get(elm.get(key))
+                if new_rid is not None:
+                    elm.set(key, new_rid)
 
     # Copy notes if present
     if source.has_notes_slide:
@@ -116,20 +228,10 @@ def copy_slide_from_other(prs: Presentation, source_slide):
     new_slide = prs.slides.add_slide(layout)
 
     # Copy background
-    source_csld = source_slide.element.find(qn("p:cSld"))
-    new_csld = new_slide.element.find(qn("p:cSld"))
+    source_csld = source_slide.element.find(_Q_CSLD)
+    new_csld = new_slide.element.find(_Q_CSLD)
     if source_csld is not None and new_csld is not None:
-        source_bg = source_csld.find(qn("p:bg"))
-        if source_bg is not None:
-            existing_bg = new_csld.find(qn("p:bg"))
-            if existing_bg is not None:
-                new_csld.remove(existing_bg)
-            new_bg = deepcopy(source_bg)
-            children = list(new_csld)
-            if children:
-                new_csld.insert(0, new_bg)
-            else:
-                new_csld.append(new_bg)
+        _copy_bg(source_csld, new_csld)
 
     # Copy shapes; for pictures, re-add with blob to ensure media is present
     for shape in source_slide.shapes:
@@ -141,7 +243,7 @@ def copy_slide_from_other(prs: Presentation, source_slide):
                 pic.alt_text = shape.alt_text
             else:
                 new_el = deepcopy(shape.element)
-                new_slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
+                new_slide.shapes._spTree.insert_element_before(new_el, _Q_EXTLST)
         except Exception:
             continue
 
@@ -158,26 +260,27 @@ def remove_slide(prs: Presentation, index: int):
 
 
 def _paragraph_level(p):
-    """Extract outline/numbering level from a docx paragraph if present."""
+    """Extract outline/numbering level from a docx `<w:p>` element if present."""
     try:
-        pPr = p._p.pPr
+        pPr = p.find(_W_PPR)
         if pPr is None:
             return 0
-        
+
         # First check for explicit numbering level
-        numPr = pPr.numPr
-        if numPr is not None:
-            ilvl = numPr.ilvl
-            if ilvl is not None and ilvl.val is not None:
-                return int(ilvl.val)
-        
+        ilvl = pPr.find(_W_ILVL_PATH)
+        if ilvl is not None:
+            val = ilvl.get(_W_VAL)
+            if val is not None:
+                return int(val)
+
         # If no numbering, check for indentation (left indent)
         # Indentation is often used to indicate hierarchy
-        ind = pPr.ind
-        if ind is not None and ind.left is not None:
+        ind = pPr.find(_W_IND)
+        if ind is not None:
+            left = ind.get(_W_LEFT)
             # Convert indentation to level (every 720 twips = 0.5 inches = 1 level)
             # Typical indentation: 0 = level 0, 720+ = level 1, 1440+ = level 2, etc.
-            left_indent = int(ind.left) if hasattr(ind.left, '__int__') else 0
+            left_indent = int(left) if left is not None else 0
             if left_indent > 0:
                 # Estimate level based on indentation (720 twips per level)
                 level = min(int(left_indent / 720), 2)  # Cap at level 2
@@ -189,12 +292,12 @@ def _paragraph_level(p):
 
 def parse_docx(doc_path: Path):
     """Parse Mod1.docx into a list of slides with title and bullet items including levels."""
-    from docx import Document
-
     doc = Document(doc_path)
     slides = []
     current = None
-    for p in doc.paragraphs:
+    # Walk the body's <w:p> children directly rather than materializing doc.paragraphs
+    for p in doc.element.body.iterchildren(_W_P):
+        # CT_P.text maps w:tab, w:br, w:noBreakHyphen etc. like Paragraph.text, minus the proxy
         text = p.text.strip()
         if not text:
             continue
@@ -215,8 +318,15 @@ def parse_docx(doc_path: Path):
     return slides
 
 
-def apply_content(new_slide, title_text: str, bullet_items):
+def apply_content(prs: Presentation, new_slide, title_text: str, bullet_items):
     """Apply title and bullet text to duplicated slide while keeping formatting."""
+    # Slide geometry is constant for the deck; resolve it once up front
+    slide_w = prs.slide_width
+    right_edge = slide_w - Inches(0.3)  # Small margin from right edge
+    threshold_x = slide_w * 0.7
+    logo_top = 0
+    shapes_list = list(new_slide.shapes)
+
     def ensure_bullet(para):
         """Force bullet display on a paragraph using the slide's default bullet style."""
         try:
@@ -225,20 +335,40 @@ def apply_content(new_slide, title_text: str, bullet_items):
             pass
         pPr = para._p.get_or_add_pPr()
         # Remove buNone if present so the template's bullet style applies.
-        for bu_none in list(pPr.findall(qn("a:buNone"))):
+        for bu_none in list(pPr.findall(_Q_BUNONE)):
             pPr.remove(bu_none)
 
-    # Find title and body shapes based on slide 2 structure, with fallbacks
+    # Single pass over the shape tree: find title and body shapes based on slide 2
+    # structure, and normalize logo / decorative bar geometry along the way
     title_shape = None
     body_shape = None
     text_shapes = []
-    for shape in new_slide.shapes:
-        if hasattr(shape, "text"):
-            text_shapes.append(shape)
-            if "OBJECTIVES" in shape.text.upper():
-                title_shape = shape
-            elif "By the end of this module" in shape.text:
-                body_shape = shape
+    for shp in shapes_list:
+        if hasattr(shp, "text"):
+            text_shapes.append(shp)
+            if "OBJECTIVES" in shp.text.upper():
+                title_shape = shp
+            elif "By the end of this module" in shp.text:
+                body_shape = shp
+        try:
+            st = shp.shape_type
+            # Position small pictures (logos) at top-right
+            if st == 13:
+                if shp.width <= Inches(3) and shp.height <= Inches(3):
+                    shp.top = logo_top
+                    shp.left = right_edge - shp.width
+            elif st == 5:  # FREEFORM
+                # An embedded image near the top-right marks the logo; anything else
+                # near the top is a decorative bar
+                has_image = bool(_BLIP_EMBED_XPATH(shp.element))
+                if has_image and shp.top < Inches(2) and shp.left > threshold_x:
+                    shp.top = logo_top
+                    shp.left = right_edge - shp.width
+                # Position decorative bars at a fixed top offset (1.06")
+                if shp.top < Inches(4) and not (has_image and shp.left > threshold_x):
+                    shp.top = Inches(1.06)
+        except Exception:
+            continue
 
     # Fallback: if body_shape not found, pick the longest text box (excluding title)
     if body_shape is None:
@@ -266,7 +396,6 @@ def apply_content(new_slide, title_text: str, bullet_items):
             for extra in runs[1:]:
                 p._p.remove(extra._r)
             # set size to ~42pt to help fit in single line
-            from pptx.util import Pt
             runs[0].font.size = Pt(42)
             runs[0].text = title_text
         else:
@@ -277,19 +406,21 @@ def apply_content(new_slide, title_text: str, bullet_items):
         tf = body_shape.text_frame
         paras = list(tf.paragraphs)
         template_para = paras[-1] if paras else None
+        # Track <a:p> elements directly; tf.paragraphs rebuilds its list on every access
+        para_els = [p._p for p in paras]
 
         # Ensure we have enough paragraphs by cloning the last one
-        while len(tf.paragraphs) < len(bullet_items) and template_para is not None:
-            new_p_el = deepcopy(template_para._p)
-            tf._element.append(new_p_el)
+        if template_para is not None:
+            for _ in range(len(bullet_items) - len(para_els)):
+                new_p_el = deepcopy(template_para._p)
+                tf._element.append(new_p_el)
+                para_els.append(new_p_el)
 
         # Update text in place to keep formatting
-        for idx, item in enumerate(bullet_items):
-            if idx >= len(tf.paragraphs):
-                break
+        for p_el, item in zip(para_els, bullet_items):
             text = item["text"]
             lvl = item.get("level", 0)
-            para = tf.paragraphs[idx]
+            para = _Paragraph(p_el, tf)
             runs = list(para.runs)
             if runs:
                 for extra in runs[1:]:
@@ -307,12 +438,9 @@ def apply_content(new_slide, title_text: str, bullet_items):
                     pPr = para._p.get_or_add_pPr()
                     # Set left indent: 720000 EMUs per level (0.5 inches)
                     indent_emus = lvl * 720000
-                    ind = pPr.find(qn("a:ind"))
+                    ind = pPr.find(_Q_IND)
                     if ind is None:
-                        from pptx.oxml import parse_xml
-                        ind_str = f'<a:ind xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" l="{indent_emus}"/>'
-                        ind_el = parse_xml(ind_str)
-                        pPr.append(ind_el)
+                        etree.SubElement(pPr, _Q_IND, l=str(indent_emus))
                     else:
                         ind.set("l", str(indent_emus))
                 else:
@@ -321,7 +449,7 @@ def apply_content(new_slide, title_text: str, bullet_items):
                     # Remove any existing indentation
                     try:
                         pPr = para._p.get_or_add_pPr()
-                        ind = pPr.find(qn("a:ind"))
+                        ind = pPr.find(_Q_IND)
                         if ind is not None:
                             pPr.remove(ind)
                     except:
@@ -331,70 +459,105 @@ def apply_content(new_slide, title_text: str, bullet_items):
                 try:
                     if lvl == 0:
                         pPr = para._p.get_or_add_pPr()
-                        ind = pPr.find(qn("a:ind"))
+                        ind = pPr.find(_Q_IND)
                         if ind is not None:
                             pPr.remove(ind)
                 except:
                     pass
             ensure_bullet(para)
 
-        # Remove extra paragraphs beyond bullet_lines
-        while len(tf.paragraphs) > len(bullet_items):
-            tf._element.remove(tf.paragraphs[-1]._p)
+        # Remove extra paragraphs beyond bullet_lines; <a:p> elements are the trailing
+        # children of txBody, so the surplus is one contiguous slice
+        if len(para_els) > len(bullet_items):
+            txBody = tf._element
+            del txBody[txBody.index(para_els[len(bullet_items)]):]
+
+
+def _png_header_dims(path: Path):
+    """Read pixel size and DPI from a PNG's IHDR/pHYs chunks without touching image data."""
+    px_w = px_h = None
+    dpi = (96, 96)
+    with open(path, "rb") as f:
+        if f.read(8) != b"\x89PNG\r\n\x1a\n":
+            raise ValueError(f"{path} is not a PNG file")
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack(">I4s", header)
+            if chunk_type == b"IHDR":
+                px_w, px_h = struct.unpack(">II", f.read(8))
+                f.seek(length - 8 + 4, 1)
+            elif chunk_type == b"pHYs":
+                ppu_x, ppu_y, unit = struct.unpack(">IIB", f.read(9))
+                if unit == 1:  # pixels per meter
+                    dpi = (ppu_x * 0.0254, ppu_y * 0.0254)
+                f.seek(length - 9 + 4, 1)
+            elif chunk_type in (b"IDAT", b"IEND"):
+                # pHYs must precede the image data, so nothing further is needed
+                break
+            else:
+                f.seek(length + 4, 1)
+    if px_w is None:
+        raise ValueError(f"{path} has no IHDR chunk")
+    return px_w, px_h, dpi
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_image_dims(path_str: str, mtime_ns: int):
+    path = Path(path_str)
+    if path.suffix.lower() == ".png":
+        px_w, px_h, dpi = _png_header_dims(path)
+    else:
+        # Image.open only parses the header; pixel data is never decoded here
+        with _PILImage.open(path) as im:
+            px_w, px_h = im.size
+            dpi = im.info.get("dpi", (96, 96))
+    dpi_x = dpi[0] or 96
+    dpi_y = dpi[1] or 96
+    return Inches(px_w / dpi_x), Inches(px_h / dpi_y)
+
+
+def _image_dims(path):
+    """Return the native (width, height) of the image at `path` as EMU lengths.
+
+    `path` may be a `Path` or an `os.DirEntry`. Results are memoized per path and
+    modification time, so repeated lookups of the same asset cost one stat() call.
+    """
+    return _cached_image_dims(os.fspath(path), path.stat().st_mtime_ns)
+
+
+def _scan_files(directory: Path):
+    """Return the regular files in `directory` as `os.DirEntry` objects sorted by name."""
+    with os.scandir(directory) as it:
+        return sorted((entry for entry in it if entry.is_file()), key=lambda entry: entry.name)
+
+
+def _map_file(path):
+    """Return a read-only memory map of the file at `path`."""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _save_with_stored_media(prs: Presentation, dst_path: Path):
+    """Save `prs`, storing already-compressed media parts instead of deflating them again.
+
+    python-pptx deflates every zip member; for PNG/JPEG/GIF blobs that only burns CPU.
+    XML and .rels members keep ZIP_DEFLATED at level 6.
+    """
+    def write(self, pack_uri, blob):
+        name = pack_uri.membername
+        if _STORED_MEDIA_RE.match(name):
+            self._zipf.writestr(name, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(name, blob, compress_type=zipfile.ZIP_DEFLATED, compresslevel=6)
 
-    # Position logo at top-right corner
-    # Get slide width from the presentation
+    original_write = _ZipPkgWriter.write
+    _ZipPkgWriter.write = write
     try:
-        prs = new_slide.part.package.presentation_part.presentation
-        slide_w = prs.slide_width
-    except:
-        slide_w = Inches(10)  # Default fallback
-    
-    margin_right = Inches(0.3)
-    logo_top = Inches(0)
-    
-    for shp in new_slide.shapes:
-        try:
-            # Position small pictures (logos) at top-right
-            if shp.shape_type == 13 and shp.width <= Inches(3) and shp.height <= Inches(3):
-                shp.top = logo_top
-                shp.left = slide_w - shp.width - margin_right
-            # Check for FREEFORM shapes with embedded images in top-right area (logos)
-            elif shp.shape_type == 5:  # FREEFORM
-                # Check if it has an embedded image and is positioned near top-right
-                has_image = False
-                for blip in shp.element.iter(qn("a:blip")):
-                    if blip.get(qn("r:embed")):
-                        has_image = True
-                        break
-                if has_image and shp.top < Inches(2) and shp.left > slide_w * 0.7:
-                    # This is likely the logo - position at top-right
-                    shp.top = logo_top
-                    shp.left = slide_w - shp.width - margin_right
-        except Exception:
-            continue
-    
-    # Position decorative bars at a fixed top offset (1.06")
-    # But exclude logos (FREEFORM shapes with images in top-right area)
-    for shp in new_slide.shapes:
-        try:
-            if shp.shape_type == 5 and shp.top < Inches(4):  # FREEFORM near top
-                # Check if this is a logo (has embedded image and is in top-right)
-                is_logo = False
-                try:
-                    has_image = False
-                    for blip in shp.element.iter(qn("a:blip")):
-                        if blip.get(qn("r:embed")):
-                            has_image = True
-                            break
-                    if has_image and shp.left > slide_w * 0.7:
-                        is_logo = True
-                except:
-                    pass
-                if not is_logo:
-                    shp.top = Inches(1.06)
-        except Exception:
-            continue
+        prs.save(dst_path)
+    finally:
+        _ZipPkgWriter.write = original_write
 
 
 def main():
@@ -406,6 +569,7 @@ def main():
 
     slides_data = parse_docx(doc_path)
     prs = Presentation(src_path)
+    _cache_partname_counters(prs.part.package)
 
     if len(prs.slides) < 2:
         raise ValueError("Presentation needs at least 2 slides to use as template.")
@@ -417,141 +581,148 @@ def main():
     generated_slides = []
     for slide_info in slides_data:
         target_slide = duplicate_slide(prs, template_slide)
-        apply_content(target_slide, slide_info["title"], slide_info["bullets"])
+        apply_content(prs, target_slide, slide_info["title"], slide_info["bullets"])
         generated_slides.append(target_slide)
 
     # Load shapes from shapes folder (for decorative elements)
     shapes_dir = root / "shapes"
     slide3_shapes = []
-    if shapes_dir.exists() and shapes_dir.is_dir():
-        for p in sorted(shapes_dir.iterdir()):
-            # Skip SVG files as python-pptx doesn't support them directly
-            if p.suffix.lower() == ".svg":
-                continue
-            if p.suffix.lower() in [".png", ".jpg", ".jpeg", ".gif", ".bmp"]:
-                try:
-                    with open(p, "rb") as f:
-                        blob = f.read()
-                    from PIL import Image
-                    # Get image dimensions
-                    try:
-                        with Image.open(p) as im:
-                            px_w, px_h = im.size
-                            dpi = im.info.get("dpi", (96, 96))
-                            dpi_x = dpi[0] or 96
-                            dpi_y = dpi[1] or 96
-                            w = Inches(px_w / dpi_x)
-                            h = Inches(px_h / dpi_y)
-                    except Exception:
-                        # Fallback: use default size if image can't be read
-                        w = Inches(2)
-                        h = Inches(2)
-                    slide3_shapes.append({
-                        "kind": "pic",
-                        "blob": blob,
-                        "width": w,
-                        "height": h,
-                    })
-                except Exception:
+    # Asset blobs are memory-mapped and only paged in for the elements actually placed
+    mapped_blobs = []
+    try:
+        if shapes_dir.exists() and shapes_dir.is_dir():
+            for p in _scan_files(shapes_dir):
+                suffix = os.path.splitext(p.name)[1].lower()
+                # Skip SVG files as python-pptx doesn't support them directly
+                if suffix == ".svg":
                     continue
-
-    # remove the original slide 3 (if present) and the template slide to avoid stale content
-    if slide3_index is not None:
-        remove_slide(prs, slide3_index)
-    remove_slide(prs, template_index)
-
-    # Use shapes from shapes folder as primary source
-    elements = slide3_shapes
-    
-    # Also load decorative elements from the elements folder (PNGs only) and add them
-    if elements_dir.exists() and elements_dir.is_dir():
-        for p in sorted(elements_dir.iterdir()):
-            if p.suffix.lower() == ".png":
-                try:
-                    with open(p, "rb") as f:
-                        blob = f.read()
-                    from PIL import Image
-                    with Image.open(p) as im:
-                        px_w, px_h = im.size
-                        dpi = im.info.get("dpi", (96, 96))
-                        dpi_x = dpi[0] or 96
-                        dpi_y = dpi[1] or 96
-                        w = Inches(px_w / dpi_x)
-                        h = Inches(px_h / dpi_y)
-                    elements.append(
-                        {
+                if suffix in [".png", ".jpg", ".jpeg", ".gif", ".bmp"]:
+                    try:
+                        blob = _map_file(p.path)
+                        mapped_blobs.append(blob)
+                        # Get image dimensions
+                        try:
+                            w, h = _image_dims(p)
+                        except Exception:
+                            # Fallback: use default size if image can't be read
+                            w = Inches(2)
+                            h = Inches(2)
+                        slide3_shapes.append({
                             "kind": "pic",
                             "blob": blob,
                             "width": w,
                             "height": h,
-                        }
-                    )
-                except Exception:
-                    continue
+                        })
+                    except Exception:
+                        continue
 
-    # Add a decorative element to bottom-right of each slide (keep original size)
-    if elements:
-        slide_w = prs.slide_width
-        slide_h = prs.slide_height
-        margin = Inches(0)  # No margin - bottom 0, right 0
-        rel_key = qn("r:embed")
-
-        for idx, slide in enumerate(prs.slides):
-            if idx == 0:
-                continue  # skip decorative element on slide 1
-            if not elements:
-                print(f"Warning: No elements available for slide {idx + 1}")
-                continue  # Ensure elements list is not empty
-            # Randomly select an element from the available images
-            elem = random.choice(elements)
-            w = elem.get("width")
-            h = elem.get("height")
-            if w is None or h is None:
-                # Use default size if unknown
-                w = Inches(2)
-                h = Inches(2)
-            left = slide_w - w - margin
-            top = slide_h - h - margin
-            if elem["kind"] == "pic":
-                try:
-                    # Create a fresh BytesIO object for each slide
-                    img_stream = BytesIO(elem["blob"])
-                    if w and h:
-                        slide.shapes.add_picture(img_stream, left, top, width=w, height=h)
-                    else:
-                        slide.shapes.add_picture(img_stream, left, top)
-                except Exception as e:
-                    print(f"Warning: Could not add image to slide {idx + 1}: {e}")
-                    # Try to add with default size as fallback
+        # remove the original slide 3 (if present) and the template slide to avoid stale content
+        if slide3_index is not None:
+            remove_slide(prs, slide3_index)
+        remove_slide(prs, template_index)
+
+        # Use shapes from shapes folder as primary source
+        elements = slide3_shapes
+
+        # Also load decorative elements from the elements folder (PNGs only) and add them
+        if elements_dir.exists() and elements_dir.is_dir():
+            for p in _scan_files(elements_dir):
+                if os.path.splitext(p.name)[1].lower() == ".png":
                     try:
-                        img_stream = BytesIO(elem["blob"])
-                        slide.shapes.add_picture(img_stream, left, top, width=Inches(2), height=Inches(2))
+                        blob = _map_file(p.path)
+                        mapped_blobs.append(blob)
+                        w, h = _image_dims(p)
+                        elements.append(
+                            {
+                                "kind": "pic",
+                                "blob": blob,
+                                "width": w,
+                                "height": h,
+                            }
+                        )
+                    except Exception:
+                        continue
+
+        # Add a decorative element to bottom-right of each slide (keep original size)
+        if elements:
+            slide_w = prs.slide_width
+            slide_h = prs.slide_height
+            margin = Inches(0)  # No margin - bottom 0, right 0
+
+            # Pick every slide's element up front and build each distinct element's image part
+            # and <p:pic> only once; later slides clone the picture and patch the few fields
+            # that differ per slide.
+            picks = random.choices(elements, k=len(prs.slides) - 1)
+            package = prs.part.package
+            pic_templates = {}
+
+            for idx, slide in enumerate(prs.slides):
+                if idx == 0:
+                    continue  # skip decorative element on slide 1
+                elem = picks[idx - 1]
+                w = elem.get("width")
+                h = elem.get("height")
+                if w is None or h is None:
+                    # Use default size if unknown
+                    w = Inches(2)
+                    h = Inches(2)
+                left = slide_w - w - margin
+                top = slide_h - h - margin
+                if elem["kind"] == "pic":
+                    try:
+                        cached = pic_templates.get(id(elem))
+                        if cached is None:
+                            image_part = package.get_or_add_image_part(BytesIO(elem["blob"]))
+                            # Slide geometry is shared, so the position is final; only the
+                            # shape id/name and the image rId are filled in per slide
+                            template_pic = CT_Picture.new_pic(
+                                0, "", image_part.desc, "", int(left), int(top), int(w), int(h)
+                            )
+                            cached = pic_templates[id(elem)] = (image_part, template_pic)
+                        image_part, template_pic = cached
+                        rId = slide.part.relate_to(image_part, RT.IMAGE)
+                        shape_id = slide.shapes._next_shape_id
+                        new_pic = deepcopy(template_pic)
+                        c_nv_pr = new_pic.nvPicPr.cNvPr
+                        c_nv_pr.id = shape_id
+                        c_nv_pr.name = "Picture %d" % (shape_id - 1)
+                        new_pic.blipFill.blip.rEmbed = rId
+                        slide.shapes._spTree.insert_element_before(new_pic, _Q_EXTLST)
+                    except Exception as e:
+                        print(f"Warning: Could not add image to slide {idx + 1}: {e}")
+                        # Try to add with default size as fallback
+                        try:
+                            img_stream = BytesIO(elem["blob"])
+                            slide.shapes.add_picture(img_stream, left, top, width=Inches(2), height=Inches(2))
+                        except Exception:
+                            continue
+                else:
+                    try:
+                        new_el = deepcopy(elem["element"])
+                        # Update position
+                        sppr = new_el.find(_Q_SPPR)
+                        if sppr is not None:
+                            xfrm = sppr.find(_Q_XFRM)
+                            if xfrm is not None:
+                                off = xfrm.find(_Q_OFF)
+                                if off is not None:
+                                    off.set("x", str(int(left)))
+                                    off.set("y", str(int(top)))
+                                else:
+                                    # Create transform if it doesn't exist
+                                    xfrm_el = sppr.makeelement(_Q_XFRM, {})
+                                    etree.SubElement(xfrm_el, _Q_OFF, x=str(int(left)), y=str(int(top)))
+                                    etree.SubElement(xfrm_el, _Q_EXT, cx=str(int(w)), cy=str(int(h)))
+                                    if sppr.find(_Q_XFRM) is None:
+                                        sppr.insert(0, xfrm_el)
+                        slide.shapes._spTree.insert_element_before(new_el, _Q_EXTLST)
                     except Exception:
                         continue
-            else:
-                try:
-                    new_el = deepcopy(elem["element"])
-                    # Update position
-                    sppr = new_el.find(qn("p:spPr"))
-                    if sppr is not None:
-                        xfrm = sppr.find(qn("a:xfrm"))
-                        if xfrm is not None:
-                            off = xfrm.find(qn("a:off"))
-                            if off is not None:
-                                off.set("x", str(int(left)))
-                                off.set("y", str(int(top)))
-                            else:
-                                # Create transform if it doesn't exist
-                                from pptx.oxml import parse_xml
-                                xfrm_str = f'<a:xfrm xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"><a:off x="{int(left)}" y="{int(top)}"/><a:ext cx="{int(w)}" cy="{int(h)}"/></a:xfrm>'
-                                xfrm_el = parse_xml(xfrm_str)
-                                if sppr.find(qn("a:xfrm")) is None:
-                                    sppr.insert(0, xfrm_el)
-                    slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
-                except Exception:
-                    continue
 
-    prs.save(dst_path)
+        _save_with_stored_media(prs, dst_path)
+    finally:
+        for blob in mapped_blobs:
+            blob.close()
     print(f"Saved updated presentation to {dst_path}")
 
 